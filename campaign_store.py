@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Campaign Store for AI Tour 2025 Project
+Append-only local store for campaign outputs, one record per campaign and per stage.
+
+Layout on disk:
+    campaign_store/
+    ├── segments/campaigns-000001.jsonl   # one compact JSON record per campaign
+    ├── segments/stages-000001.jsonl      # one compact JSON record per stage
+    └── index.jsonl                       # product/timestamp index with byte offsets
+
+Segments are rolled over once they reach a size limit, so each file stays small
+enough to scan and old segments are never rewritten. The index line for a
+campaign is written last, which makes it the commit point for that campaign.
+"""
+
+import os
+import json
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no fcntl; appends are then only safe from one process at a time
+    fcntl = None
+
+DEFAULT_STORE_DIR = "campaign_store"
+DEFAULT_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+
+
+def product_key(product_name: str) -> str:
+    """Normalize a product name for index lookups"""
+    return " ".join(product_name.lower().split())
+
+
+def to_iso(value: Any) -> Optional[str]:
+    """Convert SDK timestamps (datetime or epoch seconds) to ISO-8601 UTC strings"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat()
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+    return str(value)
+
+
+def parse_timestamp(value: str, end_of_day: bool = False) -> datetime:
+    """
+    Parse an ISO-8601 date or timestamp into an aware UTC datetime.
+
+    Naive timestamps are taken as UTC. A date without a time means the start of
+    that day, or the end of it when end_of_day is set.
+    """
+    value = value.strip()
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and "T" not in value and " " not in value:
+        parsed = parsed + timedelta(days=1) - timedelta(microseconds=1)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class CampaignStore:
+    """Append-only JSONL segment store with a product/timestamp index"""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES):
+        """Create the store directories if they don't exist yet"""
+        self.root = root
+        self.segment_dir = os.path.join(root, "segments")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.lock_path = os.path.join(root, ".lock")
+        self.segment_max_bytes = segment_max_bytes
+        os.makedirs(self.segment_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock on the store while a campaign is written"""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _current_segment(self, kind: str) -> str:
+        """Return the segment file to append to for 'campaigns' or 'stages'"""
+        existing = sorted(
+            name for name in os.listdir(self.segment_dir)
+            if name.startswith(f"{kind}-") and name.endswith(".jsonl")
+        )
+        if existing:
+            latest = existing[-1]
+            if os.path.getsize(os.path.join(self.segment_dir, latest)) < self.segment_max_bytes:
+                return latest
+            number = int(latest[len(kind) + 1:-len(".jsonl")]) + 1
+        else:
+            number = 1
+        return f"{kind}-{number:06d}.jsonl"
+
+    def _append(self, kind: str, records: List[dict]) -> dict:
+        """Append records to the current segment and return their location"""
+        segment = self._current_segment(kind)
+        path = os.path.join(self.segment_dir, segment)
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in records
+        ).encode("utf-8")
+        with open(path, "ab") as f:
+            f.write(payload)
+            f.flush()
+            offset = f.tell() - len(payload)
+        return {'segment': segment, 'offset': offset, 'length': len(payload), 'count': len(records)}
+
+    def _read(self, location: dict) -> List[dict]:
+        """Read the records stored at a segment location"""
+        path = os.path.join(self.segment_dir, location['segment'])
+        with open(path, "rb") as f:
+            f.seek(location['offset'])
+            payload = f.read(location['length'])
+        return [json.loads(line) for line in payload.decode("utf-8").splitlines() if line]
+
+    def write_campaign(self, campaign: dict, stages: List[dict]) -> str:
+        """Store a campaign and its stages, returning the campaign ID"""
+        campaign_id = campaign.get('campaign_id') or uuid.uuid4().hex
+        timestamp = campaign.get('timestamp') or datetime.now(timezone.utc).isoformat()
+        campaign = dict(campaign, campaign_id=campaign_id, timestamp=timestamp)
+
+        stage_records = [
+            dict(stage, campaign_id=campaign_id, stage_index=i)
+            for i, stage in enumerate(stages)
+        ]
+        # Concurrent runs must not interleave between choosing a segment and indexing it
+        with self._locked():
+            stage_location = self._append("stages", stage_records) if stage_records else None
+            campaign_location = self._append("campaigns", [campaign])
+
+            index_entry = {
+                'campaign_id': campaign_id,
+                'product': campaign.get('product'),
+                'product_key': product_key(campaign.get('product') or ""),
+                'timestamp': timestamp,
+                'campaign': campaign_location,
+                'stages': stage_location,
+            }
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(index_entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        return campaign_id
+
+    def iter_index(self) -> Iterator[dict]:
+        """Iterate over all committed index entries"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from an interrupted write is not a committed campaign
+                        continue
+        except FileNotFoundError:
+            return
+
+    def query(self, product: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None) -> List[dict]:
+        """Find index entries by product name and ISO timestamp range (both ends inclusive)"""
+        key = product_key(product) if product else None
+        since_at = parse_timestamp(since) if since else None
+        until_at = parse_timestamp(until, end_of_day=True) if until else None
+        results = []
+        for entry in self.iter_index():
+            if key is not None and entry['product_key'] != key:
+                continue
+            if since_at is not None or until_at is not None:
+                timestamp = parse_timestamp(entry['timestamp'])
+                if since_at is not None and timestamp < since_at:
+                    continue
+                if until_at is not None and timestamp > until_at:
+                    continue
+            results.append(entry)
+        return results
+
+    def load_campaign(self, entry: dict) -> Dict[str, Any]:
+        """Load the campaign record for an index entry"""
+        return self._read(entry['campaign'])[0]
+
+    def load_stages(self, entry: dict) -> List[dict]:
+        """Load the stage records for an index entry"""
+        if not entry.get('stages'):
+            return []
+        return self._read(entry['stages'])
+
+
+def main():
+    """Main function for command-line usage"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Query the local campaign store")
+    parser.add_argument('--store', type=str, default=DEFAULT_STORE_DIR, help='Campaign store directory')
+    parser.add_argument('--product', type=str, help='Only show campaigns for this product')
+    parser.add_argument('--since', type=str, help='Only show campaigns at or after this ISO timestamp')
+    parser.add_argument('--until', type=str, help='Only show campaigns at or before this ISO timestamp (a date includes the whole day)')
+    parser.add_argument('--show', action='store_true', help='Print the final response and stages of each campaign')
+
+    args = parser.parse_args()
+
+    store = CampaignStore(args.store)
+    try:
+        entries = store.query(product=args.product, since=args.since, until=args.until)
+    except ValueError as e:
+        parser.error(f"--since/--until must be ISO dates or timestamps: {e}")
+    print(f"📊 Found {len(entries)} campaign(s)")
+
+    for entry in entries:
+        campaign = store.load_campaign(entry)
+        usage = campaign.get('usage') or {}
+        print(f"\n📋 {entry['timestamp']}  {entry['product']}  ({entry['campaign_id']})")
+        print(f"   • Status: {campaign.get('status')}")
+        print(f"   • Duration: {campaign.get('duration_seconds')}s")
+        print(f"   • Tokens: {usage.get('total_tokens')}")
+        print(f"   • Cached prompt tokens: {usage.get('cached_prompt_tokens')}/{usage.get('prompt_tokens')} "
+              f"(hit rate: {campaign.get('prompt_cache_hit_rate')})")
+        print(f"   • Images: {len(campaign.get('image_urls') or [])}")
+        if args.show:
+            for stage in store.load_stages(entry):
+                print(f"   - {stage.get('stage')}: {stage.get('duration_seconds')}s, "
+                      f"{(stage.get('usage') or {}).get('total_tokens')} tokens")
+            print(f"\nAgent response: {campaign.get('response_text')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Configuration loading for the multi-agent marketing campaign generator.
+Shared by the demo, the token profiler and the config watcher.
+"""
+
+import yaml
+
+DEFAULT_MODEL = "gpt-4o"
+
+# Load agent configurations from YAML file
+def load_agent_configs(config_file="agent_configs.yaml"):
+    """
+    Load agent configurations from a YAML file
+    """
+    try:
+        with open(config_file, 'r', encoding='utf-8') as file:
+            config_data = yaml.safe_load(file)
+            return config_data['agents']
+    except FileNotFoundError:
+        print(f"Error: Configuration file '{config_file}' not found.")
+        raise
+    except yaml.YAMLError as e:
+        print(f"Error parsing YAML file: {e}")
+        raise
+    except KeyError:
+        print("Error: 'agents' key not found in configuration file.")
+        raise
+
+def load_orchestrator_config(config_file="orchestrator_config.yaml"):
+    """
+    Load orchestrator configuration from a YAML file
+    """
+    try:
+        with open(config_file, 'r', encoding='utf-8') as file:
+            config_data = yaml.safe_load(file)
+            return config_data['orchestrator']
+    except FileNotFoundError:
+        print(f"Error: Configuration file '{config_file}' not found.")
+        raise
+    except yaml.YAMLError as e:
+        print(f"Error parsing YAML file: {e}")
+        raise
+    except KeyError:
+        print("Error: 'orchestrator' key not found in configuration file.")
+        raise
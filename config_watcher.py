@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Config Watcher for AI Tour 2025 Project
+Watches agent_configs.yaml and updates the deployed agents when it changes.
+
+Only agents whose instructions or model changed are updated, with one update_agent
+call each. The orchestrator's tool list is rebuilt only when connected agents are added
+or removed, or a description changes, since the description only lives in the
+orchestrator's connected agent tool.
+
+A run captures the orchestrator's settings when it starts, but calls connected agents
+by ID when it reaches their stage. An in-place update is therefore picked up by the
+remaining stages of campaigns already running. With --versioned, each changed agent is
+created as a new version and the orchestrator is repointed to it instead, so running
+campaigns keep the old prompts at the cost of an extra create_agent and orchestrator
+update per change. Agents removed from the YAML (and superseded versions) are detached,
+not deleted, and recorded in detached_agents.json for cleanup_automation.py --session.
+"""
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+from azure.ai.projects import AIProjectClient
+from azure.ai.agents.models import ConnectedAgentTool
+from azure.identity import DefaultAzureCredential
+from dotenv import load_dotenv
+
+from config_loader import load_agent_configs, load_orchestrator_config, DEFAULT_MODEL
+from sdk_helpers import get_field
+
+# Load environment variables
+load_dotenv()
+
+# Detached agents are recorded in cleanup_automation.py's session file format
+DETACHED_AGENTS_FILE = "detached_agents.json"
+
+
+def diff_configs(desired: Dict[str, dict], deployed: Dict[str, dict]) -> dict:
+    """
+    Compare YAML agent configs with the deployed agents.
+
+    Both arguments map agent name to a dict with 'instructions', 'description' and
+    'model'. Returns the names to add and remove, and the changed fields of
+    every agent that differs.
+    """
+    added = [name for name in desired if name not in deployed]
+    removed = [name for name in deployed if name not in desired]
+    updated = {}
+    for name, config in desired.items():
+        if name not in deployed:
+            continue
+        changes = {
+            field: config[field]
+            for field in ('instructions', 'description', 'model')
+            if config[field] != deployed[name][field]
+        }
+        if changes:
+            updated[name] = changes
+
+    return {
+        'added': added,
+        'removed': removed,
+        'updated': updated,
+    }
+
+
+def validate_configs(configs) -> Optional[str]:
+    """Return why the agent configs can't be applied, or None if they are valid"""
+    if not isinstance(configs, list):
+        return "'agents' must be a list"
+    names = set()
+    for i, config in enumerate(configs):
+        if not isinstance(config, dict):
+            return f"agent entry {i + 1} is not a mapping"
+        for field in ('name', 'instructions', 'description'):
+            if not isinstance(config.get(field), str) or not config[field].strip():
+                return f"agent entry {i + 1} has no '{field}'"
+        if 'model' in config and not isinstance(config['model'], str):
+            return f"agent '{config['name']}' has an invalid 'model'"
+        if config['name'] in names:
+            return f"agent name '{config['name']}' is used more than once"
+        names.add(config['name'])
+    return None
+
+
+def normalize_config(config: dict) -> dict:
+    """Reduce an agent config from the YAML to the fields deployed agents are compared on"""
+    return {
+        'instructions': config["instructions"],
+        'description': config["description"],
+        'model': config.get("model", DEFAULT_MODEL),
+    }
+
+
+class ConfigWatcher:
+    """Watch the agent configuration file and apply changes to live agents"""
+
+    def __init__(self, config_file: str = "agent_configs.yaml", orchestrator_id: Optional[str] = None,
+                 orchestrator_name: Optional[str] = None, dry_run: bool = False, versioned: bool = False,
+                 session_file: str = DETACHED_AGENTS_FILE):
+        """Initialize the watcher with Azure AI client"""
+        self.config_file = config_file
+        self.versioned = versioned
+        self.session_file = session_file
+        self.orchestrator_id = orchestrator_id
+        self.orchestrator_name = orchestrator_name or load_orchestrator_config()["name"]
+        self.dry_run = dry_run
+        self.orchestrator = None
+        self.agent_ids: Dict[str, str] = {}
+        self.deployed: Dict[str, dict] = {}
+        try:
+            self.project_client = AIProjectClient.from_connection_string(
+                credential=DefaultAzureCredential(),
+                conn_str=os.environ["PROJECT_CONNECTION_STRING"]
+            )
+            print("✅ Successfully connected to Azure AI Project")
+        except KeyError:
+            print("❌ Error: PROJECT_CONNECTION_STRING environment variable not found")
+            print("   Please make sure your .env file contains the connection string")
+            sys.exit(1)
+        except Exception as e:
+            print(f"❌ Error connecting to Azure AI Project: {e}")
+            sys.exit(1)
+
+    def find_orchestrator(self):
+        """Find the orchestrator by ID, or the most recently created one by name"""
+        if self.orchestrator_id:
+            return self.project_client.agents.get_agent(self.orchestrator_id)
+
+        newest = None
+        has_more = True
+        after = None
+        while has_more:
+            if after:
+                agents_page = self.project_client.agents.list_agents(limit=100, after=after)
+            else:
+                agents_page = self.project_client.agents.list_agents(limit=100)
+            for agent in agents_page.data:
+                if get_field(agent, 'name') == self.orchestrator_name:
+                    if newest is None or get_field(agent, 'created_at') > get_field(newest, 'created_at'):
+                        newest = agent
+            has_more = getattr(agents_page, 'has_more', False) and bool(agents_page.data)
+            if has_more:
+                after = get_field(agents_page.data[-1], 'id')
+        return newest
+
+    def load_deployment(self) -> bool:
+        """Read the orchestrator and its connected agents from the service"""
+        try:
+            self.orchestrator = self.find_orchestrator()
+        except Exception as e:
+            print(f"❌ Error finding the orchestrator: {e}")
+            return False
+        if self.orchestrator is None:
+            print(f"❌ No deployed orchestrator named '{self.orchestrator_name}' found")
+            return False
+        print(f"🔗 Watching orchestrator: {self.orchestrator.name} (ID: {self.orchestrator.id})")
+
+        self.agent_ids = {}
+        self.deployed = {}
+        for tool in self.orchestrator.tools or []:
+            if get_field(tool, 'type') != 'connected_agent':
+                continue
+            connected = get_field(tool, 'connected_agent')
+            name = get_field(connected, 'name')
+            try:
+                agent = self.project_client.agents.get_agent(get_field(connected, 'id'))
+            except Exception as e:
+                print(f"❌ Error loading connected agent {name} (ID: {get_field(connected, 'id')}): {e}")
+                return False
+            self.agent_ids[name] = agent.id
+            self.deployed[name] = {
+                'instructions': agent.instructions,
+                'description': get_field(connected, 'description'),
+                'model': agent.model,
+            }
+            print(f"   - {name} (ID: {agent.id})")
+        return True
+
+    def connected_agent_tools(self, configs: List[dict], agent_ids: Dict[str, str]) -> List:
+        """Build the orchestrator's tool list in YAML order, keeping its other tools as they are"""
+        tools = []
+        for config in configs:
+            connected_tool = ConnectedAgentTool(
+                id=agent_ids[config["name"]],
+                name=config["name"],
+                description=config["description"]
+            )
+            tools.extend(connected_tool.definitions)
+        other_tools = [tool for tool in self.orchestrator.tools or [] if get_field(tool, 'type') != 'connected_agent']
+        return tools + other_tools
+
+    def create_specialist(self, name: str, config: dict) -> str:
+        """Create a connected agent and return its ID"""
+        agent = self.project_client.agents.create_agent(
+            model=config['model'],
+            name=name,
+            instructions=config['instructions'],
+            description=config['description'],
+        )
+        return agent.id
+
+    def record_detached(self, detached: List[Tuple[str, str]]):
+        """Add detached agents to the session file so cleanup_automation.py --session can delete them"""
+        try:
+            with open(self.session_file, 'r') as f:
+                session_data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            session_data = {'agents': [], 'threads': []}
+        session_data['timestamp'] = datetime.now().isoformat()
+        session_data.setdefault('agents', []).extend({'id': agent_id, 'name': name} for name, agent_id in detached)
+        session_data.setdefault('threads', [])
+        with open(self.session_file, 'w') as f:
+            json.dump(session_data, f, indent=2)
+
+    def apply(self, configs: List[dict]) -> dict:
+        """Diff the configs against the deployed agents and apply the changes"""
+        desired = {config["name"]: normalize_config(config) for config in configs}
+        diff = diff_configs(desired, self.deployed)
+
+        if not (diff['added'] or diff['removed'] or diff['updated']):
+            print("ℹ️  No agent changes detected")
+            return diff
+
+        # The description only lives in the orchestrator's connected agent tool
+        agent_changes = {
+            name: {field: value for field, value in changes.items() if field != 'description'}
+            for name, changes in diff['updated'].items()
+        }
+        agent_changes = {name: changes for name, changes in agent_changes.items() if changes}
+        description_changed = any('description' in changes for changes in diff['updated'].values())
+        rebuild_tools = bool(diff['added'] or diff['removed'] or description_changed
+                             or (self.versioned and agent_changes))
+
+        for name, changes in agent_changes.items():
+            verb = "New version of" if self.versioned else "Updating"
+            print(f"✏️  {verb} {name}: {', '.join(changes)}")
+        for name in diff['added']:
+            print(f"➕ Creating {name}")
+        if rebuild_tools:
+            print(f"🔧 Rebuilding orchestrator tools ({len(configs)} connected agents)")
+        if self.dry_run:
+            print("ℹ️  Dry run - no changes applied")
+            return diff
+
+        if not self.versioned:
+            for name, changes in agent_changes.items():
+                self.project_client.agents.update_agent(self.agent_ids[name], **changes)
+                self.deployed[name].update(changes)
+
+        agent_ids = dict(self.agent_ids)
+        created = []
+        try:
+            for name in list(agent_changes if self.versioned else []) + diff['added']:
+                agent_ids[name] = self.create_specialist(name, desired[name])
+                created.append((name, agent_ids[name]))
+            if rebuild_tools:
+                self.orchestrator = self.project_client.agents.update_agent(
+                    self.orchestrator.id,
+                    tools=self.connected_agent_tools(configs, agent_ids),
+                )
+        except Exception:
+            # Nothing points at the agents created so far, so remove them again
+            for name, agent_id in created:
+                try:
+                    self.project_client.agents.delete_agent(agent_id)
+                except Exception as e:
+                    print(f"❌ Error deleting {name} (ID: {agent_id}): {e}")
+                    self.record_detached([(name, agent_id)])
+            raise
+
+        # Superseded versions and removed agents may still serve an in-flight run, so they are only detached
+        detached = [(name, self.agent_ids[name]) for name in diff['removed']]
+        if self.versioned:
+            detached.extend((name, self.agent_ids[name]) for name in agent_changes)
+        for name, agent_id in detached:
+            print(f"➖ Detached {name} (ID: {agent_id}) - recorded in {self.session_file}")
+        if detached:
+            self.record_detached(detached)
+
+        self.agent_ids = {name: agent_ids[name] for name in desired}
+        self.deployed = desired
+
+        print("✅ Agents updated")
+        return diff
+
+    def read_configs(self) -> Optional[List[dict]]:
+        """Reparse the configuration file, returning None if it is not valid yet"""
+        # Editors may save in several steps; wait for the next change
+        try:
+            configs = load_agent_configs(self.config_file)
+        except (FileNotFoundError, yaml.YAMLError, KeyError, TypeError):
+            print("⚠️  Keeping the deployed agents until the configuration is valid again")
+            return None
+        error = validate_configs(configs)
+        if error:
+            print(f"⚠️  Invalid configuration: {error}")
+            print("⚠️  Keeping the deployed agents until the configuration is valid again")
+            return None
+        return configs
+
+    def apply_safely(self, configs: List[dict]):
+        """Apply the configs, reporting service errors instead of stopping the watcher"""
+        try:
+            self.apply(configs)
+        except Exception as e:
+            print(f"❌ Error applying configuration: {e}")
+            print("   Changes not applied will be retried on the next change to the configuration")
+
+    def file_signature(self) -> Optional[Tuple[int, int]]:
+        """Modification time and size of the configuration file"""
+        try:
+            stat = os.stat(self.config_file)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def watch(self, interval: float = 2.0, once: bool = False):
+        """Apply the current configuration, then poll the file and apply every change"""
+        if not self.load_deployment():
+            return
+
+        signature = self.file_signature()
+        configs = self.read_configs()
+        if configs is not None:
+            self.apply_safely(configs)
+        if once:
+            return
+
+        print(f"\n👀 Watching {self.config_file} for changes (Ctrl+C to stop)...")
+        try:
+            while True:
+                time.sleep(interval)
+                current = self.file_signature()
+                if current == signature:
+                    continue
+                signature = current
+                print(f"\n🔄 {self.config_file} changed")
+                configs = self.read_configs()
+                if configs is not None:
+                    self.apply_safely(configs)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+
+
+def main():
+    """Main function for command-line usage"""
+    print("🤖 AI Tour 2025 - Config Watcher")
+    print("================================")
+
+    import argparse
+    parser = argparse.ArgumentParser(description="Apply agent_configs.yaml changes to the deployed agents in place")
+    parser.add_argument('--config', type=str, default="agent_configs.yaml", help='Agent configuration file to watch')
+    parser.add_argument('--orchestrator-id', type=str, help='Orchestrator agent ID (default: newest agent with the orchestrator name)')
+    parser.add_argument('--orchestrator-name', type=str, help='Orchestrator agent name (default: from orchestrator_config.yaml)')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds between checks for changes')
+    parser.add_argument('--once', action='store_true', help='Apply the current configuration once and exit')
+    parser.add_argument('--dry-run', action='store_true', help='Only print the changes that would be applied')
+    parser.add_argument('--versioned', action='store_true',
+                        help='Create a new version of each changed agent instead of updating it in place, '
+                             'so running campaigns keep the old prompts (costs an orchestrator update per change)')
+    parser.add_argument('--session-file', type=str, default=DETACHED_AGENTS_FILE,
+                        help='Session file that records detached agents for cleanup_automation.py --session')
+
+    args = parser.parse_args()
+
+    watcher = ConfigWatcher(
+        config_file=args.config,
+        orchestrator_id=args.orchestrator_id,
+        orchestrator_name=args.orchestrator_name,
+        dry_run=args.dry_run,
+        versioned=args.versioned,
+        session_file=args.session_file,
+    )
+    watcher.watch(interval=args.interval, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,17 @@
 import os
-import yaml
+import re
+import time
 from azure.ai.projects import AIProjectClient
 from azure.ai.agents.models import ConnectedAgentTool, MessageRole, OpenApiTool, OpenApiConnectionAuthDetails, OpenApiConnectionSecurityScheme
 import jsonref
 from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 import json
+from campaign_store import CampaignStore, to_iso
+from config_loader import load_agent_configs, load_orchestrator_config, DEFAULT_MODEL
+from sdk_helpers import get_field
 load_dotenv()
 
-# Load agent configurations from YAML file
-def load_agent_configs(config_file="agent_configs.yaml"):
-    """
-    Load agent configurations from a YAML file
-    """
-    try:
-        with open(config_file, 'r', encoding='utf-8') as file:
-            config_data = yaml.safe_load(file)
-            return config_data['agents']
-    except FileNotFoundError:
-        print(f"Error: Configuration file '{config_file}' not found.")
-        raise
-    except yaml.YAMLError as e:
-        print(f"Error parsing YAML file: {e}")
-        raise
-    except KeyError:
-        print("Error: 'agents' key not found in configuration file.")
-        raise
-
-def load_orchestrator_config(config_file="orchestrator_config.yaml"):
-    """
-    Load orchestrator configuration from a YAML file
-    """
-    try:
-        with open(config_file, 'r', encoding='utf-8') as file:
-            config_data = yaml.safe_load(file)
-            return config_data['orchestrator']
-    except FileNotFoundError:
-        print(f"Error: Configuration file '{config_file}' not found.")
-        raise
-    except yaml.YAMLError as e:
-        print(f"Error parsing YAML file: {e}")
-        raise
-    except KeyError:
-        print("Error: 'orchestrator' key not found in configuration file.")
-        raise
-
 # Load agent configurations
 AGENT_CONFIGS = load_agent_configs()
 ORCHESTRATOR_CONFIG = load_orchestrator_config()
@@ -55,7 +22,7 @@ def create_agent_and_tool(project_client, config):
     """
     # Create agent WITHOUT file tools - only the orchestrator needs them
     agent = project_client.agents.create_agent(
-        model="gpt-4o",
+        model=config.get("model", DEFAULT_MODEL),
         name=config["name"],
         instructions=config["instructions"],
         # No tools for individual agents - they just provide focused responses
@@ -69,6 +36,110 @@ def create_agent_and_tool(project_client, config):
     
     return agent, connected_tool
 
+def usage_to_dict(usage):
+    """
+    Convert SDK run/run step usage into a plain dict of token counts
+    """
+    if usage is None:
+        return None
+    prompt_tokens = get_field(usage, 'prompt_tokens')
+    # Cached prompt tokens are only reported when the service returns prompt token details
+    cached_tokens = get_field(get_field(usage, 'prompt_tokens_details'), 'cached_tokens')
+    return {
+        'prompt_tokens': prompt_tokens,
+        'cached_prompt_tokens': cached_tokens,
+        'uncached_prompt_tokens': prompt_tokens - cached_tokens if prompt_tokens is not None and cached_tokens is not None else None,
+        'completion_tokens': get_field(usage, 'completion_tokens'),
+        'total_tokens': get_field(usage, 'total_tokens'),
+    }
+
+def prompt_cache_hit_rate(usage):
+    """
+    Share of prompt tokens served from the prompt cache, or None if not reported
+    """
+    if not usage or not usage['prompt_tokens'] or usage['cached_prompt_tokens'] is None:
+        return None
+    return round(usage['cached_prompt_tokens'] / usage['prompt_tokens'], 4)
+
+def duration_seconds(started_at, finished_at):
+    """
+    Seconds between two SDK timestamps, or None if either is missing
+    """
+    if started_at is None or finished_at is None:
+        return None
+    if hasattr(started_at, 'timestamp'):
+        started_at, finished_at = started_at.timestamp(), finished_at.timestamp()
+    return round(finished_at - started_at, 3)
+
+IMAGE_URL_PATTERN = re.compile(r"https://replicate\.delivery/[^\s)\]\"'>]+")
+
+def extract_image_urls(text):
+    """
+    Find generated image URLs in agent or tool output
+    """
+    if not text:
+        return []
+    return list(dict.fromkeys(IMAGE_URL_PATTERN.findall(str(text))))
+
+def collect_stage_records(project_client, thread_id, run_id):
+    """
+    Build one record per run step (connected agent call, image tool call or message) of a run
+    """
+    stages = []
+    after = None
+    has_more = True
+
+    while has_more:
+        if after:
+            steps_page = project_client.agents.list_run_steps(thread_id=thread_id, run_id=run_id, order="asc", limit=100, after=after)
+        else:
+            steps_page = project_client.agents.list_run_steps(thread_id=thread_id, run_id=run_id, order="asc", limit=100)
+
+        for step in steps_page.data:
+            record = {
+                'step_id': step.id,
+                'type': step.type,
+                'status': step.status,
+                'started_at': to_iso(step.created_at),
+                'completed_at': to_iso(step.completed_at),
+                'duration_seconds': duration_seconds(step.created_at, step.completed_at),
+                'usage': usage_to_dict(step.usage),
+                'stage': "message_creation",
+                'text': None,
+                'image_urls': [],
+            }
+            tool_calls = get_field(step.step_details, 'tool_calls') or []
+            if tool_calls:
+                names = []
+                outputs = []
+                for tool_call in tool_calls:
+                    call_type = get_field(tool_call, 'type')
+                    details = get_field(tool_call, call_type) or {}
+                    names.append(get_field(details, 'name') or call_type)
+                    output = get_field(details, 'output')
+                    if output:
+                        outputs.append(str(output))
+                record['stage'] = ",".join(names)
+                record['text'] = "\n\n".join(outputs) or None
+                record['image_urls'] = extract_image_urls(record['text'])
+            stages.append(record)
+
+        has_more = getattr(steps_page, 'has_more', False) and bool(steps_page.data)
+        if has_more:
+            after = steps_page.data[-1].id
+
+    return stages
+
+def get_latest_assistant_message(project_client, thread_id, run_id):
+    """
+    Fetch only the newest message of the run instead of listing the whole thread
+    """
+    messages = project_client.agents.list_messages(thread_id=thread_id, run_id=run_id, order="desc", limit=1)
+    for message in messages.data:
+        if message.role == "assistant":
+            return message
+    return None
+
 def delete_agents(project_client, agents):
     """
     Function to delete multiple agents
@@ -84,7 +155,8 @@ project_client = AIProjectClient.from_connection_string(
 )
 
 # Load the OpenAPI specification for Replicate Imagen-4 API
-with open("replicate_imagen4_spec_fixed.json", "r") as f:
+IMAGE_TOOL_CONFIG = ORCHESTRATOR_CONFIG["image_tool"]
+with open(IMAGE_TOOL_CONFIG["spec_file"], "r") as f:
     replicate_imagen4_spec = jsonref.loads(f.read())
 
 # Create or use existing connection for Replicate API
@@ -124,9 +196,9 @@ auth = OpenApiConnectionAuthDetails(
 
 # Create OpenApiTool for image generation
 image_generation_tool = OpenApiTool(
-    name="generate_image",
+    name=IMAGE_TOOL_CONFIG["name"],
     spec=replicate_imagen4_spec,
-    description="Generate high-quality images using Google's Imagen-4 model on Replicate. Use this tool when the image_generator agent provides visual concepts and you need to create actual images. The tool accepts prompts and returns URLs to generated images.",
+    description=IMAGE_TOOL_CONFIG["description"],
     auth=auth
 )
 
@@ -148,7 +220,7 @@ with project_client:
         connected_agent_tools.extend(tool.definitions)
     
     marketing_campaign_orchestrator = project_client.agents.create_agent(
-        model="gpt-4o",
+        model=ORCHESTRATOR_CONFIG.get("model", DEFAULT_MODEL),
         name=ORCHESTRATOR_CONFIG["name"],
         instructions=ORCHESTRATOR_CONFIG["instructions"],
         tools=connected_agent_tools + image_generation_tool.definitions,  # Include image generation tool
@@ -173,27 +245,65 @@ with project_client:
     print(f"Created message, ID: {message.id}")
 
     # Create a run with connected agents
+    run_started = time.time()
     run = project_client.agents.create_and_process_run(
         thread_id=thread.id, 
         agent_id=marketing_campaign_orchestrator.id
     )
+    run_finished = time.time()
     print(f"Run finished with status: {run.status}")
 
     if run.status == "failed":
         print(f"Run failed: {run.last_error}")
 
-    # Print the Agent's response message with optional citation
-    messages = project_client.agents.list_messages(thread_id=thread.id)
-    for message in messages.data:
-        if message.role == "assistant":
-            for content in message.content:
-                if hasattr(content, 'text') and hasattr(content.text, 'value'):
-                    print(f"Agent response: {content.text.value}")
-            # Handle citations if they exist
-            if hasattr(message, 'url_citation_annotations') and message.url_citation_annotations:
-                for annotation in message.url_citation_annotations:
-                    print(f"URL Citation: [{annotation.url_citation.title}]({annotation.url_citation.url})")
-            break  # Get the first agent message
+    # Get the Agent's final response with optional citations
+    response_text = None
+    citations = []
+    message = get_latest_assistant_message(project_client, thread.id, run.id)
+    if message:
+        texts = [content.text.value for content in message.content
+                 if hasattr(content, 'text') and hasattr(content.text, 'value')]
+        response_text = "\n\n".join(texts)
+        # Handle citations if they exist
+        if hasattr(message, 'url_citation_annotations') and message.url_citation_annotations:
+            for annotation in message.url_citation_annotations:
+                citations.append({'title': annotation.url_citation.title, 'url': annotation.url_citation.url})
+        print(f"Agent response: {response_text}")
+        for citation in citations:
+            print(f"URL Citation: [{citation['title']}]({citation['url']})")
+
+    # Store the campaign and its per-stage records
+    stages = collect_stage_records(project_client, thread.id, run.id)
+    image_urls = extract_image_urls(response_text)
+    for stage in stages:
+        image_urls.extend(url for url in stage['image_urls'] if url not in image_urls)
+
+    run_usage = usage_to_dict(run.usage)
+    cache_hit_rate = prompt_cache_hit_rate(run_usage)
+    if cache_hit_rate is not None:
+        print(f"Prompt cache: {run_usage['cached_prompt_tokens']}/{run_usage['prompt_tokens']} prompt tokens cached ({cache_hit_rate:.1%})")
+
+    store = CampaignStore(os.getenv("CAMPAIGN_STORE_DIR", "campaign_store"))
+    campaign_id = store.write_campaign(
+        {
+            'product': product_name,
+            'thread_id': thread.id,
+            'run_id': run.id,
+            'orchestrator_id': marketing_campaign_orchestrator.id,
+            'status': str(run.status),
+            'last_error': str(run.last_error) if run.last_error else None,
+            'started_at': to_iso(run_started),
+            'completed_at': to_iso(run_finished),
+            'duration_seconds': round(run_finished - run_started, 3),
+            'usage': run_usage,
+            'prompt_cache_hit_rate': cache_hit_rate,
+            'response_text': response_text,
+            'image_urls': image_urls,
+            'citations': citations,
+        },
+        stages,
+    )
+    print(f"Stored campaign {campaign_id} ({len(stages)} stages, {len(image_urls)} images) in {store.root}")
 
     # Delete the main agent
     #project_client.agents.delete_agent(main_agent.id)
@@ -0,0 +1,17 @@
+"""
+Helpers for reading Azure AI Agents SDK objects.
+Shared by the demo and the config watcher.
+"""
+
+
+def get_field(obj, name, default=None):
+    """
+    Read a field from an SDK model or a plain dict
+    """
+    if obj is None:
+        return default
+    if hasattr(obj, name):
+        return getattr(obj, name)
+    if hasattr(obj, 'get'):
+        return obj.get(name, default)
+    return default
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Token Profiler for AI Tour 2025 Project
+Estimates static prompt sizes and per-campaign token usage offline, without deploying agents.
+
+Counts use tiktoken's o200k_base encoding (gpt-4o) when tiktoken is installed and
+fall back to a ~4 characters per token approximation otherwise. Tool schemas are
+measured as the JSON the agents service receives; the model sees a rendered form
+of the same schema, so treat the numbers as estimates for comparing configs.
+"""
+
+import json
+from typing import Dict, List
+
+import jsonref
+import yaml
+
+from config_loader import load_agent_configs, load_orchestrator_config
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except ImportError:
+    _ENCODING = None
+
+# Placeholder agent ID with the same length as a real "asst_..." ID
+PLACEHOLDER_AGENT_ID = "asst_" + "x" * 24
+
+# Agent name whose output is turned into actual images by the image tool
+IMAGE_STAGE_AGENT = "image_generator"
+
+# Provider prompt caching: prompts of at least 1024 tokens, cached in 128-token increments
+CACHE_MIN_PREFIX_TOKENS = 1024
+CACHE_INCREMENT_TOKENS = 128
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in a piece of text"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, round(len(text) / 4))
+
+
+def count_json_tokens(value) -> int:
+    """Count tokens of a JSON-serializable value in its compact wire form"""
+    return count_tokens(json.dumps(value, separators=(",", ":"), ensure_ascii=False))
+
+
+def cacheable_tokens(shared_prefix_tokens: int) -> int:
+    """Number of tokens of a shared prompt prefix the provider can serve from cache"""
+    if shared_prefix_tokens < CACHE_MIN_PREFIX_TOKENS:
+        return 0
+    extra = shared_prefix_tokens - CACHE_MIN_PREFIX_TOKENS
+    return CACHE_MIN_PREFIX_TOKENS + extra // CACHE_INCREMENT_TOKENS * CACHE_INCREMENT_TOKENS
+
+
+def load_spec(spec_file: str):
+    """Load an OpenAPI spec (JSON or YAML) with $refs resolved"""
+    with open(spec_file, "r", encoding="utf-8") as f:
+        if spec_file.endswith((".yaml", ".yml")):
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    return jsonref.replace_refs(spec, lazy_load=False, proxies=False)
+
+
+def connected_agent_definition(config: dict) -> dict:
+    """Offline equivalent of ConnectedAgentTool(...).definitions for one agent"""
+    return {
+        "type": "connected_agent",
+        "connected_agent": {
+            "id": PLACEHOLDER_AGENT_ID,
+            "name": config["name"],
+            "description": config["description"],
+        },
+    }
+
+
+def openapi_tool_definition(name: str, description: str, spec) -> dict:
+    """Offline equivalent of OpenApiTool(...).definitions for one spec"""
+    return {
+        "type": "openapi",
+        "openapi": {
+            "name": name,
+            "description": description,
+            "spec": spec,
+            "auth": {"type": "connection", "security_scheme": {"connection_id": ""}},
+        },
+    }
+
+
+def profile_static(agent_configs: List[dict], orchestrator_config: dict, extra_specs: List[str]) -> dict:
+    """Compute the static prompt size of every agent and tool"""
+    image_tool = orchestrator_config["image_tool"]
+
+    agents = {
+        config["name"]: count_tokens(config["instructions"])
+        for config in agent_configs
+    }
+    tools = {
+        config["name"]: count_json_tokens(connected_agent_definition(config))
+        for config in agent_configs
+    }
+    tools[image_tool["name"]] = count_json_tokens(openapi_tool_definition(
+        image_tool["name"], image_tool["description"], load_spec(image_tool["spec_file"])
+    ))
+
+    # Specs that are not attached to the orchestrator, measured for comparison only
+    unattached = {
+        spec_file: count_json_tokens(openapi_tool_definition(spec_file, "", load_spec(spec_file)))
+        for spec_file in extra_specs
+    }
+
+    orchestrator_instructions = count_tokens(orchestrator_config["instructions"])
+    return {
+        'orchestrator_instructions': orchestrator_instructions,
+        'orchestrator_static': orchestrator_instructions + sum(tools.values()),
+        'agents': agents,
+        'tools': tools,
+        'unattached_specs': unattached,
+    }
+
+
+def project_campaign(static: dict, agent_configs: List[dict], image_tool_name: str,
+                     user_message_tokens: int = 20, stage_output_tokens: int = 400,
+                     images: int = 2, polls_per_image: int = 2, image_call_tokens: int = 150,
+                     final_output_tokens: int = 1500) -> dict:
+    """
+    Project token totals for one campaign under the orchestrator's handoff pattern.
+
+    The orchestrator calls each connected agent in config order, passing all
+    previous responses as context, runs the image tool after the image_generator
+    stage, and finishes with a consolidated answer. Every orchestrator turn resends
+    its instructions, all tool schemas and the conversation so far.
+
+    Cached prompt tokens come from the orchestrator's own conversation: each turn
+    extends the previous turn's prompt, so that prompt is a cacheable prefix whatever
+    the handoff layout is. Specialist prompts start with their own instructions, so
+    they share no prefix with each other and only their instructions repeat across
+    campaigns, which is cacheable only once it reaches the provider's minimum size.
+    """
+    calls = []
+    contributors: Dict[str, int] = {}
+    history = user_message_tokens  # conversation the orchestrator replays every turn
+    previous_outputs = 0  # context handed to the next specialist
+    previous_prompt = 0  # orchestrator prompt of the previous turn
+
+    def add(name, tokens):
+        contributors[name] = contributors.get(name, 0) + tokens
+
+    def orchestrator_turn(label, completion_tokens):
+        nonlocal history, previous_prompt
+        prompt = static['orchestrator_static'] + history
+        # The first turn shares only the static part, with earlier campaigns
+        cached = cacheable_tokens(previous_prompt or static['orchestrator_static'])
+        calls.append({'call': f"orchestrator → {label}", 'prompt_tokens': prompt,
+                      'cached_prompt_tokens': cached, 'completion_tokens': completion_tokens})
+        previous_prompt = prompt
+        add("orchestrator instructions", static['orchestrator_instructions'])
+        for tool_name, tool_tokens in static['tools'].items():
+            add(f"tool schema: {tool_name}", tool_tokens)
+        add("orchestrator history replay", history)
+        add("completions", completion_tokens)
+        history += completion_tokens
+
+    for config in agent_configs:
+        name = config["name"]
+        handoff = previous_outputs + user_message_tokens
+        # The orchestrator writes the handoff message as the tool call arguments
+        orchestrator_turn(name, handoff)
+
+        prompt = static['agents'][name] + handoff
+        calls.append({'call': name, 'prompt_tokens': prompt,
+                      'cached_prompt_tokens': cacheable_tokens(static['agents'][name]),
+                      'completion_tokens': stage_output_tokens})
+        add(f"agent instructions: {name}", static['agents'][name])
+        add("specialist handoff context", handoff)
+        add("completions", stage_output_tokens)
+
+        history += stage_output_tokens
+        previous_outputs += stage_output_tokens
+
+        if name == IMAGE_STAGE_AGENT:
+            for _ in range(images * (1 + polls_per_image)):
+                orchestrator_turn(image_tool_name, image_call_tokens // 2)
+                history += image_call_tokens
+            previous_outputs += images * image_call_tokens
+
+    orchestrator_turn("final answer", final_output_tokens)
+
+    prompt_tokens = sum(call['prompt_tokens'] for call in calls)
+    cached_prompt_tokens = sum(call['cached_prompt_tokens'] for call in calls)
+    completion_tokens = sum(call['completion_tokens'] for call in calls)
+    return {
+        'calls': calls,
+        'model_calls': len(calls),
+        'prompt_tokens': prompt_tokens,
+        'cached_prompt_tokens': cached_prompt_tokens,
+        'uncached_prompt_tokens': prompt_tokens - cached_prompt_tokens,
+        'prompt_cache_hit_rate': round(cached_prompt_tokens / prompt_tokens, 4) if prompt_tokens else 0,
+        'completion_tokens': completion_tokens,
+        'total_tokens': prompt_tokens + completion_tokens,
+        'contributors': dict(sorted(contributors.items(), key=lambda item: item[1], reverse=True)),
+    }
+
+
+def print_report(static: dict, projection: dict, top: int, flag_share: float):
+    """Print the static sizes and the campaign projection"""
+    method = "tiktoken o200k_base" if _ENCODING is not None else "~4 chars/token approximation"
+    print(f"🔢 Token counts: {method}")
+
+    print("\n📋 Static prompt size per agent (instructions):")
+    for name, tokens in static['agents'].items():
+        print(f"   - {name}: {tokens}")
+
+    print("\n📋 Static prompt size per tool (schema sent with every orchestrator turn):")
+    for name, tokens in static['tools'].items():
+        print(f"   - {name}: {tokens}")
+    print(f"\n   • Orchestrator instructions: {static['orchestrator_instructions']}")
+    print(f"   • Orchestrator static prompt: {static['orchestrator_static']}")
+
+    if static['unattached_specs']:
+        print("\n📋 Unattached OpenAPI specs (size if attached as a tool):")
+        for spec_file, tokens in static['unattached_specs'].items():
+            print(f"   - {spec_file}: {tokens}")
+
+    print(f"\n📊 Projected per-campaign usage ({projection['model_calls']} model calls):")
+    print(f"   • Prompt tokens: {projection['prompt_tokens']}")
+    print(f"   • Cached prompt tokens (orchestrator history prefix): {projection['cached_prompt_tokens']} "
+          f"({projection['prompt_cache_hit_rate']:.1%})")
+    print(f"   • Uncached prompt tokens: {projection['uncached_prompt_tokens']}")
+    print(f"   • Completion tokens: {projection['completion_tokens']}")
+    print(f"   • Total tokens: {projection['total_tokens']}")
+
+    print(f"\n🔍 Largest contributors (top {top}):")
+    total = projection['total_tokens']
+    for name, tokens in list(projection['contributors'].items())[:top]:
+        share = tokens / total if total else 0
+        marker = "⚠️ " if share >= flag_share else "   "
+        print(f"{marker}- {name}: {tokens} ({share:.1%})")
+
+
+def main():
+    """Main function for command-line usage"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Offline token cost estimator for agent configs")
+    parser.add_argument('--agents-config', type=str, default="agent_configs.yaml", help='Agent configuration file')
+    parser.add_argument('--orchestrator-config', type=str, default="orchestrator_config.yaml", help='Orchestrator configuration file')
+    parser.add_argument('--spec', action='append', default=[], help='Additional OpenAPI spec to measure (repeatable)')
+    parser.add_argument('--stage-output-tokens', type=int, default=400, help='Assumed response size of each specialist agent')
+    parser.add_argument('--final-output-tokens', type=int, default=1500, help='Assumed size of the final campaign package')
+    parser.add_argument('--images', type=int, default=2, help='Images generated per campaign')
+    parser.add_argument('--polls-per-image', type=int, default=2, help='get_prediction calls per image')
+    parser.add_argument('--top', type=int, default=8, help='Number of contributors to list')
+    parser.add_argument('--flag-share', type=float, default=0.10, help='Flag contributors above this share of total tokens')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    args = parser.parse_args()
+
+    agent_configs = load_agent_configs(args.agents_config)
+    orchestrator_config = load_orchestrator_config(args.orchestrator_config)
+
+    static = profile_static(agent_configs, orchestrator_config, args.spec)
+    projection = project_campaign(
+        static,
+        agent_configs,
+        orchestrator_config["image_tool"]["name"],
+        stage_output_tokens=args.stage_output_tokens,
+        images=args.images,
+        polls_per_image=args.polls_per_image,
+        final_output_tokens=args.final_output_tokens,
+    )
+
+    if args.json:
+        print(json.dumps({'static': static, 'projection': projection}, indent=2))
+    else:
+        print_report(static, projection, args.top, args.flag_share)
+
+
+if __name__ == "__main__":
+    main()